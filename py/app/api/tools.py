@@ -138,7 +138,10 @@ async def get_user_openai_tools(
                                 "type": param_info.get("type", "string"),
                                 "description": param_info.get("description", f"{param_name} parameter")
                             }
-                            
+                            for schema_key in ("items", "minimum"):
+                                if schema_key in param_info:
+                                    openai_tool["function"]["parameters"]["properties"][param_name][schema_key] = param_info[schema_key]
+
                             # Add to required list if parameter is required
                             if param_info.get("required", False):
                                 openai_tool["function"]["parameters"]["required"].append(param_name)
@@ -4,6 +4,7 @@ Authentication Service - Simplified
 import secrets
 import httpx
 import json
+import logging
 from typing import Tuple, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -160,15 +161,15 @@ class AuthService:
             # Check if response contains an error instead of access token
             if "error" in token_data:
                 error_msg = f"OAuth error: {token_data.get('error')} - {token_data.get('error_description', 'No description')}"
-                print(f"💥 DEBUG: OAuth token exchange failed: {error_msg}")
+                logging.debug("💥 OAuth token exchange failed: %s", error_msg)
                 raise ValueError(error_msg)
             
             # Verify that we got an access token
             if "access_token" not in token_data:
-                print(f"💥 DEBUG: No access_token in response: {list(token_data.keys())}")
+                logging.debug("💥 No access_token in response: %s", list(token_data.keys()))
                 raise ValueError("No access_token received from OAuth provider")
                 
-            print(f"✅ DEBUG: OAuth token exchange successful, got keys: {list(token_data.keys())}")
+            logging.debug("✅ OAuth token exchange successful, got keys: %s", list(token_data.keys()))
             return token_data
     
     async def _save_credentials(self, user: User, tool_name: str, token_data: Dict[str, Any]):
@@ -226,17 +227,17 @@ class AuthService:
         auth_record = result.scalar_one_or_none()
         
         if not auth_record:
-            print(f"❌ DEBUG: No auth record found for user_id={user_id}, tool_name={tool_name}")
+            logging.debug("❌ No auth record found for user_id=%s, tool_name=%s", user_id, tool_name)
             return None
         
-        print(f"✅ DEBUG: Auth record found for user_id={user_id}, tool_name={tool_name}")
+        logging.debug("✅ Auth record found for user_id=%s, tool_name=%s", user_id, tool_name)
         
         try:
             decrypted_creds = decrypt_credentials(user.id, auth_record.encrypted_credentials)
-            print(f"🔓 DEBUG: Successfully decrypted credentials, keys: {list(decrypted_creds.keys())}")
+            logging.debug("🔓 Successfully decrypted credentials, keys: %s", list(decrypted_creds.keys()))
             return decrypted_creds
         except Exception as e:
-            print(f"💥 DEBUG: Failed to decrypt credentials: {e}")
+            logging.warning("💥 Failed to decrypt credentials: %s", e)
             return None
     
     async def get_user_tools(self, user_id: str) -> list:
@@ -308,13 +309,13 @@ class AuthService:
             # Try to decrypt and check if it contains an error
             decrypted_creds = decrypt_credentials(user.id, auth_record.encrypted_credentials)
             if "error" in decrypted_creds and "access_token" not in decrypted_creds:
-                print(f"🧹 DEBUG: Cleaning up invalid credentials for user_id={user_id}, tool_name={tool_name}")
+                logging.debug("🧹 Cleaning up invalid credentials for user_id=%s, tool_name=%s", user_id, tool_name)
                 # Mark as not authenticated but don't delete the record
                 auth_record.is_authenticated = False
                 auth_record.updated_at = datetime.utcnow()
                 await self.db.commit()
                 return True
         except Exception as e:
-            print(f"💥 DEBUG: Error checking credentials for cleanup: {e}")
+            logging.warning("💥 Error checking credentials for cleanup: %s", e)
         
         return False 
\ No newline at end of file
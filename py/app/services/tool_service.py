@@ -5,6 +5,7 @@ import subprocess
 import os
 import json
 import asyncio
+import logging
 from typing import Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
@@ -36,8 +37,8 @@ class ToolService:
         self._active_executions = 0
         self._queued_executions = 0
         
-        print(f"🚀 ToolService initialized with {max_concurrent_executions} concurrent executions")
-        print(f"📊 Load config: {os.getenv('LOAD_CONFIG', 'medium')}")
+        logging.debug("🚀 ToolService initialized with %s concurrent executions", max_concurrent_executions)
+        logging.debug("📊 Load config: %s", os.getenv('LOAD_CONFIG', 'medium'))
     
     async def execute_tool(self, user_id: str, tool_name: str, action: str, parameters: Dict[str, Any] = None) -> Dict[str, Any]:
         """Execute a tool action for a user"""
@@ -66,7 +67,7 @@ class ToolService:
             
             # Check if credentials contain OAuth errors (additional safety check)
             if "error" in credentials and "access_token" not in credentials:
-                print(f"🧹 DEBUG: Found invalid credentials with error, cleaning up...")
+                logging.debug("🧹 Found invalid credentials with error, cleaning up...")
                 await self.auth_service.cleanup_invalid_credentials(user_id, tool_name)
                 raise ValueError(f"Invalid authentication for {tool_name}. Please re-authenticate via OAuth.")
 
@@ -157,27 +158,24 @@ class ToolService:
         """Prepare environment variables for tool execution"""
         env = {}
         
-        # Debug: Log credentials structure (without exposing sensitive data)
-        print(f"🔐 DEBUG: Credential keys available: {list(credentials.keys())}")
-        
         # Add common auth environment variables
         if "access_token" in credentials:
             env["ACCESS_TOKEN"] = credentials["access_token"]
-            print("✅ ACCESS_TOKEN set from 'access_token' field")
         else:
-            print("❌ 'access_token' field not found in credentials")
+            logging.debug("❌ 'access_token' field not found in credentials")
         
         if "refresh_token" in credentials:
             env["REFRESH_TOKEN"] = credentials["refresh_token"]
-            print("✅ REFRESH_TOKEN set from 'refresh_token' field")
         
         # Add other credential fields as environment variables
         for key, value in credentials.items():
             if isinstance(value, str):
                 env[key.upper()] = value
-                print(f"🔑 Added env var: {key.upper()}")
         
-        print(f"🌍 Environment variables set: {list(env.keys())}")
+        # Log credential structure (names only, never values) when debugging
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("🔐 Credential keys available: %s", list(credentials.keys()))
+            logging.debug("🌍 Environment variables set: %s", list(env.keys()))
         return env
     
     async def get_tool_info(self, tool_name: str) -> Optional[Dict[str, Any]]:
@@ -192,7 +190,6 @@ class ToolService:
                 tool_info = json.load(f)
                 return tool_info
         except Exception as e:
-            import logging
             logging.error(f"Error loading tool info for {tool_name}: {e}")
             return None
     
@@ -6,7 +6,7 @@ import json
 import sys
 import os
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, Callable
 
 
 def get_auth_headers() -> Dict[str, str]:
@@ -105,6 +105,13 @@ def get_user_info(parameters: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+_ACTIONS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "list_repositories": list_repositories,
+    "create_repository": create_repository,
+    "get_user_info": get_user_info
+}
+
+
 def main():
     """Main execution function"""
     try:
@@ -115,14 +122,10 @@ def main():
         parameters = input_data.get("parameters", {})
         
         # Execute action
-        if action == "list_repositories":
-            result = list_repositories(parameters)
-        elif action == "create_repository":
-            result = create_repository(parameters)
-        elif action == "get_user_info":
-            result = get_user_info(parameters)
-        else:
+        handler = _ACTIONS.get(action)
+        if handler is None:
             raise ValueError(f"Unknown action: {action}")
+        result = handler(parameters)
         
         # Return result
         print(json.dumps(result))
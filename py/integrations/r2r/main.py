@@ -2,41 +2,175 @@
 """
 R2R Integration - Main Script
 """
+import asyncio
+import functools
+import hashlib
 import json
+import math
+import operator
 import sys
 import os
-from typing import Dict, Any
+import stat
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, Tuple
+
+# Prefer orjson when installed; results may carry UUIDs/datetimes, which fall back to str()
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumpb(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+
+    def _json_default(obj: Any) -> str:
+        # Match orjson's ISO 8601 output for dates and times
+        return obj.isoformat() if hasattr(obj, "isoformat") else str(obj)
+
+    def _dumpb(obj: Any) -> bytes:
+        return json.dumps(obj, default=_json_default).encode()
+
+# The SDK is imported once; a missing package is reported when a client is first needed
+try:
+    from r2r import R2RClient
+    _R2R_AVAILABLE = True
+except ImportError:
+    R2RClient = None
+    _R2R_AVAILABLE = False
+
+try:
+    from r2r import R2RAsyncClient
+    _R2R_ASYNC_AVAILABLE = True
+except ImportError:
+    R2RAsyncClient = None
+    _R2R_ASYNC_AVAILABLE = False
+
+
+# Authenticated R2R clients keyed by credentials, reused across actions in one process
+_CLIENT_CACHE: Dict[Tuple[Optional[str], ...], Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+# Async clients are bound to the event loop they were created on, so each loop keeps its own.
+# Values are the logged-in client, or the login future while it is still running.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[Optional[str], ...], Any]]" = weakref.WeakKeyDictionary()
+
+# Recent login failures keyed like _CLIENT_CACHE: (error message, monotonic time a retry is allowed)
+_FAILED_LOGINS: Dict[Tuple[Optional[str], ...], Tuple[str, float]] = {}
+LOGIN_FAILURE_TTL = 30.0
+
+# Worker mode coalescing: at most SEARCH_BATCH_SIZE waiting search/rag requests per dispatch
+SEARCH_BATCH_SIZE = 16
+
+# Longest NDJSON request line accepted in worker mode
+MAX_REQUEST_LINE_BYTES = 16 * 1024 * 1024
+
+# Upper bound on concurrent searches for search_batch
+SEARCH_BATCH_MAX_WORKERS = 16
+
+# Default number of concurrent fetches for get_documents_bulk
+BULK_FETCH_CONCURRENCY = 10
+
+# Credentials are passed in through the environment, which is fixed for the process lifetime
+_ENV_CREDS: Dict[str, Optional[str]] = {
+    "api_base": os.getenv("R2R_API_BASE"),
+    "base_url": os.getenv("R2R_BASE_URL"),
+    "api_key": os.getenv("R2R_API_KEY"),
+    "email": os.getenv("R2R_EMAIL"),
+    "password": os.getenv("R2R_PASSWORD")
+}
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a numeric setting from the environment, using `default` if it is unset or malformed."""
+    try:
+        value = float(os.getenv(name, default))
+    except ValueError:
+        return default
+    return value if math.isfinite(value) else default
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting outbound R2R calls to `rate` per second (0 disables it)."""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # A negative balance is a queue of callers already waiting for refills
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+    
+    def __enter__(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    async def __aenter__(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+# Process-wide cap on R2R requests per second (R2R_MAX_RPS, unset or 0 disables it)
+_MAX_RPS = _env_float("R2R_MAX_RPS", 0.0)
+_RATE_LIMITER = TokenBucket(_MAX_RPS)
 
 
 def get_r2r_credentials() -> Dict[str, str]:
     """Get R2R credentials from environment."""
-    api_base = os.getenv("R2R_API_BASE")
-    base_url = os.getenv("R2R_BASE_URL") 
-    api_key = os.getenv("R2R_API_KEY")
-    email = os.getenv("R2R_EMAIL")
-    password = os.getenv("R2R_PASSWORD")
-    
-    if not api_base or not base_url:
+    if not _ENV_CREDS["api_base"] or not _ENV_CREDS["base_url"]:
         raise ValueError("R2R API base URL not found")
     
-    return {
-        "api_base": api_base,
-        "base_url": base_url,
-        "api_key": api_key,
-        "email": email,
-        "password": password
-    }
+    return _ENV_CREDS
 
 
-def get_r2r_client():
-    """Initialize R2R client with user credentials."""
-    try:
-        from r2r import R2RClient
-    except ImportError:
+def _secret_digest(secret: Optional[str]) -> Optional[str]:
+    """Hash a secret so cache keys never hold it in plain text."""
+    if secret is None:
+        return None
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def _credentials_key(credentials: Dict[str, str]) -> Tuple[Optional[str], ...]:
+    """Build a hashable cache key from R2R credentials."""
+    return (
+        credentials["base_url"],
+        credentials["email"],
+        _secret_digest(credentials["password"]),
+        _secret_digest(credentials["api_key"])
+    )
+
+
+def _build_client(credentials: Dict[str, str]):
+    """Initialize R2R client and log in with the given credentials."""
+    if not _R2R_AVAILABLE:
         raise ValueError("R2R client not installed. Please install r2r package.")
     
-    credentials = get_r2r_credentials()
-    
     # Initialize client with base URL
     client = R2RClient(base_url=credentials["base_url"])
     
@@ -59,157 +193,709 @@ def get_r2r_client():
     return client
 
 
+def _raise_recent_login_failure(key: Tuple[Optional[str], ...]):
+    """Raise the login error for these credentials if it is still within LOGIN_FAILURE_TTL."""
+    failure = _FAILED_LOGINS.get(key)
+    if failure is None:
+        return
+    message, retry_at = failure
+    if time.monotonic() < retry_at:
+        # A fresh error each time, so repeated raises don't pile tracebacks onto one object
+        raise ValueError(message)
+    _FAILED_LOGINS.pop(key, None)
+
+
+def get_r2r_client():
+    """Get an authenticated R2R client, reusing the cached one for these credentials."""
+    credentials = get_r2r_credentials()
+    key = _credentials_key(credentials)
+    
+    client = _CLIENT_CACHE.get(key)
+    if client is not None:
+        return client
+    
+    # Concurrent worker requests wait for a single login instead of each logging in
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is not None:
+            return client
+        
+        # Fail fast on credentials that were just rejected instead of retrying the login
+        _raise_recent_login_failure(key)
+        
+        try:
+            client = _build_client(credentials)
+        except ValueError as e:
+            _FAILED_LOGINS[key] = (str(e), time.monotonic() + LOGIN_FAILURE_TTL)
+            raise
+        
+        _CLIENT_CACHE[key] = client
+        return client
+
+
+def evict_r2r_client(client=None):
+    """Drop the cached client for the current credentials so the next call logs in again.
+    
+    When `client` is given, it is only dropped if it is still the cached one, so a
+    client another thread just logged in with is kept.
+    """
+    key = _credentials_key(get_r2r_credentials())
+    with _CLIENT_LOCK:
+        if client is None or _CLIENT_CACHE.get(key) is client:
+            _CLIENT_CACHE.pop(key, None)
+
+
+def _is_unauthorized(error: Exception) -> bool:
+    """Check whether an R2R error means the session is no longer authenticated."""
+    return getattr(error, "status_code", None) == 401
+
+
+def _call_r2r(call: Callable[[Any], Any]) -> Any:
+    """Run an R2R call with the cached client, logging in again once on 401."""
+    client = get_r2r_client()
+    try:
+        with _RATE_LIMITER:
+            return call(client)
+    except Exception as e:
+        if not _is_unauthorized(e):
+            raise
+        evict_r2r_client(client)
+    
+    with _RATE_LIMITER:
+        return call(get_r2r_client())
+
+
+async def _build_async_client(credentials: Dict[str, str]):
+    """Initialize an async R2R client and log in with the given credentials."""
+    if not _R2R_ASYNC_AVAILABLE:
+        raise ValueError("R2R async client not installed. Please install r2r package.")
+    
+    client = R2RAsyncClient(base_url=credentials["base_url"])
+    
+    if credentials["email"] and credentials["password"]:
+        try:
+            await client.users.login(
+                email=credentials["email"],
+                password=credentials["password"]
+            )
+        except Exception as e:
+            raise ValueError(f"R2R login failed: {str(e)}")
+    elif not credentials["api_key"]:
+        raise ValueError("R2R credentials (email/password or API key) not found")
+    
+    return client
+
+
+def _async_clients_for(loop: asyncio.AbstractEventLoop) -> Dict[Tuple[Optional[str], ...], Any]:
+    """Return the async client cache of `loop`, forgetting the caches of loops that have closed."""
+    for closed_loop in [other for other in _ASYNC_CLIENTS if other.is_closed()]:
+        _ASYNC_CLIENTS.pop(closed_loop, None)
+    return _ASYNC_CLIENTS.setdefault(loop, {})
+
+
+async def get_r2r_async_client():
+    """Get an authenticated async R2R client, shared by all tasks on the running event loop.
+    
+    Meant for one long-lived loop (the worker); call close_r2r_async_clients() before it ends.
+    """
+    credentials = get_r2r_credentials()
+    key = _credentials_key(credentials)
+    clients = _async_clients_for(asyncio.get_running_loop())
+    
+    cached = clients.get(key)
+    if cached is not None and not isinstance(cached, asyncio.Future):
+        return cached
+    
+    # Concurrent tasks await the same login instead of each logging in
+    login = cached
+    if login is None:
+        _raise_recent_login_failure(key)
+        login = asyncio.ensure_future(_build_async_client(credentials))
+        clients[key] = login
+    
+    try:
+        # A cancelled caller must not cancel the login other tasks are waiting on
+        client = await asyncio.shield(login)
+    except Exception as e:
+        # Any failed login is dropped so the next call retries once LOGIN_FAILURE_TTL has passed
+        if clients.get(key) is login:
+            clients.pop(key, None)
+            _FAILED_LOGINS[key] = (str(e), time.monotonic() + LOGIN_FAILURE_TTL)
+        raise
+    
+    # Keep the client itself, not the finished future
+    if clients.get(key) is login:
+        clients[key] = client
+    return client
+
+
+def _evict_async_client(client):
+    """Drop `client` from the running loop's cache if it is still the cached one."""
+    key = _credentials_key(get_r2r_credentials())
+    clients = _ASYNC_CLIENTS.get(asyncio.get_running_loop(), {})
+    if clients.get(key) is client:
+        clients.pop(key, None)
+
+
+async def close_r2r_async_clients():
+    """Close and forget the async clients of the running event loop."""
+    clients = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), {})
+    for cached in clients.values():
+        if isinstance(cached, asyncio.Future):
+            cached.cancel()
+            continue
+        close = getattr(cached, "close", None)
+        if close is None:
+            continue
+        try:
+            await close()
+        except Exception:
+            pass
+
+
+async def _acall_r2r(call: Callable[[Any], Awaitable[Any]]) -> Any:
+    """Async counterpart of _call_r2r, using the event loop's async client."""
+    client = await get_r2r_async_client()
+    try:
+        async with _RATE_LIMITER:
+            return await call(client)
+    except Exception as e:
+        if not _is_unauthorized(e):
+            raise
+        _evict_async_client(client)
+    
+    async with _RATE_LIMITER:
+        return await call(await get_r2r_async_client())
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after being stored."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any) -> Any:
+        """Return the cached value, or None if missing or expired."""
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Any, value: Any):
+        """Store a value, evicting the least recently used entries over maxsize."""
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# Recent search/rag results, so repeated queries within R2R_RESULT_CACHE_TTL skip R2R entirely
+_RESULT_CACHE_TTL = _env_float("R2R_RESULT_CACHE_TTL", 60.0)
+_RESULT_CACHE = TTLCache(maxsize=256, ttl=_RESULT_CACHE_TTL)
+
+
+def _result_cache_key(*parts: Any) -> Optional[Tuple[Any, ...]]:
+    """Build a per-credentials result cache key, or None when caching does not apply."""
+    if _RESULT_CACHE_TTL <= 0:
+        return None
+    key = (_credentials_key(get_r2r_credentials()),) + parts
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+@functools.lru_cache(maxsize=4096)
 def id_to_shorthand(id: str) -> str:
     """Convert ID to shorthand format."""
     return str(id)[:7]
 
 
+def _format_community(content) -> Tuple[str, ...]:
+    return (
+        f"Community Name: {content.name}",
+        f"ID: {content.id}",
+        f"Summary: {content.summary}"
+    )
+
+
+def _format_entity(content) -> Tuple[str, ...]:
+    return (
+        f"Entity Name: {content.name}",
+        f"Description: {content.description}"
+    )
+
+
+def _format_relationship(content) -> Tuple[str, ...]:
+    return (f"Relationship: {content.subject}-{content.predicate}-{content.object}",)
+
+
+def _format_unknown(content) -> Tuple[str, ...]:
+    return ()
+
+
+# Graph content formatter per content class; R2R uses one model class per kind of graph result
+_GRAPH_CONTENT_FORMATTERS: Dict[type, Callable[[Any], Tuple[str, ...]]] = {}
+
+
+def _graph_content_formatter(content) -> Callable[[Any], Tuple[str, ...]]:
+    """Pick the formatter for a graph result's content, detecting its shape once per class."""
+    content_type = type(content)
+    formatter = _GRAPH_CONTENT_FORMATTERS.get(content_type)
+    if formatter is None:
+        if hasattr(content, "summary"):
+            formatter = _format_community
+        elif hasattr(content, "name") and hasattr(content, "description"):
+            formatter = _format_entity
+        elif (
+            hasattr(content, "subject")
+            and hasattr(content, "predicate")
+            and hasattr(content, "object")
+        ):
+            formatter = _format_relationship
+        else:
+            formatter = _format_unknown
+        _GRAPH_CONTENT_FORMATTERS[content_type] = formatter
+    return formatter
+
+
+def _format_chunk_results(chunk_results, lines: list):
+    lines.append("Vector Search Results:")
+    for c in chunk_results:
+        lines.extend((f"Source ID [{id_to_shorthand(c.id)}]:", c.text or ""))
+
+
+def _format_graph_results(graph_results, lines: list):
+    lines.append("Graph Search Results:")
+    for g in graph_results:
+        lines.append(f"Source ID [{id_to_shorthand(g.id)}]:")
+        lines.extend(_graph_content_formatter(g.content)(g.content))
+
+
+def _format_web_results(web_results, lines: list):
+    lines.append("Web Search Results:")
+    for w in web_results:
+        lines.extend((
+            f"Source ID [{id_to_shorthand(w.id)}]:",
+            f"Title: {w.title}",
+            f"Link: {w.link}",
+            f"Snippet: {w.snippet}"
+        ))
+
+
+def _format_document_results(document_results, lines: list):
+    lines.append("Local Context Documents:")
+    for doc_result in document_results:
+        doc_id = doc_result.id
+        summary = doc_result.summary
+
+        lines.extend((
+            f"Full Document ID: {doc_id}",
+            f"Shortened Document ID: {id_to_shorthand(doc_id)}",
+            f"Document Title: {doc_result.title or 'Untitled Document'}"
+        ))
+        if summary:
+            lines.append(f"Summary: {summary}")
+
+        if hasattr(doc_result, 'chunks') and doc_result.chunks:
+            lines.extend(
+                f"\nChunk ID {id_to_shorthand(chunk['id'])}:\n{chunk['text']}"
+                for chunk in doc_result.chunks
+            )
+
+
+# Result sections in output order: (attribute on the search results, formatter)
+_RESULT_SECTIONS = (
+    ("chunk_search_results", _format_chunk_results),
+    ("graph_search_results", _format_graph_results),
+    ("web_search_results", _format_web_results),
+    ("document_search_results", _format_document_results)
+)
+
+# Sections supported by each results class that declares its fields (pydantic models)
+_SECTIONS_BY_TYPE: Dict[type, Tuple[Tuple[str, Callable[[Any, list], None]], ...]] = {}
+
+
+def _result_sections(results) -> Tuple[Tuple[str, Callable[[Any, list], None]], ...]:
+    """Return the sections a search results object can have, resolved once per class."""
+    results_type = type(results)
+    sections = _SECTIONS_BY_TYPE.get(results_type)
+    if sections is not None:
+        return sections
+    
+    fields = getattr(results_type, "model_fields", None) or getattr(results_type, "__fields__", None)
+    if not fields:
+        # Without a declared schema the attributes may differ between instances
+        return tuple(section for section in _RESULT_SECTIONS if hasattr(results, section[0]))
+    
+    sections = tuple(section for section in _RESULT_SECTIONS if section[0] in fields)
+    _SECTIONS_BY_TYPE[results_type] = sections
+    return sections
+
+
 def format_search_results_for_llm(results) -> str:
     """Format search results for LLM consumption."""
     lines = []
 
-    # 1) Chunk search
-    if hasattr(results, 'chunk_search_results') and results.chunk_search_results:
-        lines.append("Vector Search Results:")
-        for c in results.chunk_search_results:
-            lines.append(f"Source ID [{id_to_shorthand(c.id)}]:")
-            lines.append(c.text or "")
-
-    # 2) Graph search
-    if hasattr(results, 'graph_search_results') and results.graph_search_results:
-        lines.append("Graph Search Results:")
-        for g in results.graph_search_results:
-            lines.append(f"Source ID [{id_to_shorthand(g.id)}]:")
-            if hasattr(g.content, "summary"):
-                lines.append(f"Community Name: {g.content.name}")
-                lines.append(f"ID: {g.content.id}")
-                lines.append(f"Summary: {g.content.summary}")
-            elif hasattr(g.content, "name") and hasattr(g.content, "description"):
-                lines.append(f"Entity Name: {g.content.name}")
-                lines.append(f"Description: {g.content.description}")
-            elif (
-                hasattr(g.content, "subject")
-                and hasattr(g.content, "predicate")
-                and hasattr(g.content, "object")
-            ):
-                lines.append(
-                    f"Relationship: {g.content.subject}-{g.content.predicate}-{g.content.object}"
-                )
-
-    # 3) Web search
-    if hasattr(results, 'web_search_results') and results.web_search_results:
-        lines.append("Web Search Results:")
-        for w in results.web_search_results:
-            lines.append(f"Source ID [{id_to_shorthand(w.id)}]:")
-            lines.append(f"Title: {w.title}")
-            lines.append(f"Link: {w.link}")
-            lines.append(f"Snippet: {w.snippet}")
-
-    # 4) Local context docs
-    if hasattr(results, 'document_search_results') and results.document_search_results:
-        lines.append("Local Context Documents:")
-        for doc_result in results.document_search_results:
-            doc_title = doc_result.title or "Untitled Document"
-            doc_id = doc_result.id
-            summary = doc_result.summary
-
-            lines.append(f"Full Document ID: {doc_id}")
-            lines.append(f"Shortened Document ID: {id_to_shorthand(doc_id)}")
-            lines.append(f"Document Title: {doc_title}")
-            if summary:
-                lines.append(f"Summary: {summary}")
-
-            if hasattr(doc_result, 'chunks') and doc_result.chunks:
-                for chunk in doc_result.chunks:
-                    lines.append(
-                        f"\nChunk ID {id_to_shorthand(chunk['id'])}:\n{chunk['text']}"
-                    )
+    for attribute, format_section in _result_sections(results):
+        section_results = getattr(results, attribute)
+        if section_results:
+            format_section(section_results, lines)
 
     result = "\n".join(lines)
     return result if result else "No results found."
 
 
+# Optional fields returned for each kind of R2R item, besides id/short_id
+_DOCUMENT_FIELDS = ("title", "created_at")
+_DOCUMENT_DETAIL_FIELDS = ("title", "created_at", "size", "metadata")
+_COLLECTION_FIELDS = ("name", "description")
+
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=None)
+def _field_getter(fields: Tuple[str, ...]) -> Callable[[Any], Any]:
+    """Build one C-level getter that reads all fields of an item at once."""
+    return operator.attrgetter(*fields)
+
+
+def _fields_from_obj(item, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Extract fields from an SDK model, skipping attributes it does not have."""
+    info = {
+        "id": item.id,
+        "short_id": id_to_shorthand(item.id)
+    }
+    try:
+        values = _field_getter(fields)(item)
+    except AttributeError:
+        # Some field is missing on this model, fall back to reading them one by one
+        for field in fields:
+            value = getattr(item, field, _MISSING)
+            if value is not _MISSING:
+                info[field] = value
+    else:
+        info.update(zip(fields, values if len(fields) > 1 else (values,)))
+    return info
+
+
+def _fields_from_dict(item: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Extract fields from a plain dict item."""
+    info = {
+        "id": item["id"],
+        "short_id": id_to_shorthand(item["id"])
+    }
+    for field in fields:
+        if field in item:
+            info[field] = item[field]
+    return info
+
+
+def _fields_from_tuple(item, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Extract fields from a positional (id, *fields) row."""
+    info = {
+        "id": item[0],
+        "short_id": id_to_shorthand(item[0])
+    }
+    info.update(zip(fields, item[1:]))
+    return info
+
+
+_EXTRACTORS = {
+    "obj": _fields_from_obj,
+    "dict": _fields_from_dict,
+    "tuple": _fields_from_tuple
+}
+
+
+def _item_kind(item) -> str:
+    """Detect how an R2R item exposes its fields."""
+    if isinstance(item, dict):
+        return "dict"
+    if isinstance(item, (tuple, list)):
+        return "tuple"
+    return "obj"
+
+
+def _iter_items(items, fields: Tuple[str, ...]) -> Iterator[Dict[str, Any]]:
+    """Yield normalized items, choosing the extractor once from the first item."""
+    iterator = iter(items)
+    first = next(iterator, _MISSING)
+    if first is _MISSING:
+        return
+    
+    extract = _EXTRACTORS[_item_kind(first)]
+    yield extract(first, fields)
+    for item in iterator:
+        yield extract(item, fields)
+
+
+def _search_result(search_response, query: str, limit: int) -> Dict[str, Any]:
+    """Build the search action result from an R2R search response."""
+    return {
+        "results": format_search_results_for_llm(search_response.results),
+        "query": query,
+        "limit": limit
+    }
+
+
 def search(parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Perform a vector search in the R2R knowledge base."""
-    client = get_r2r_client()
+    query = parameters["query"]
+    limit = parameters.get("limit", 10)
     
+    cache_key = _result_cache_key("search", query, limit)
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    
+    search_response = _call_r2r(lambda client: client.retrieval.search(
+        query=query,
+        limit=limit
+    ))
+    
+    result = _search_result(search_response, query, limit)
+    _RESULT_CACHE.set(cache_key, dict(result))
+    return result
+
+
+async def asearch(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Perform a vector search without blocking the event loop."""
     query = parameters["query"]
     limit = parameters.get("limit", 10)
     
-    search_response = client.retrieval.search(
+    cache_key = _result_cache_key("search", query, limit)
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    
+    search_response = await _acall_r2r(lambda client: client.retrieval.search(
         query=query,
         limit=limit
-    )
+    ))
     
-    formatted_results = format_search_results_for_llm(search_response.results)
+    result = _search_result(search_response, query, limit)
+    _RESULT_CACHE.set(cache_key, dict(result))
+    return result
+
+
+def search_batch(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Run several vector searches concurrently with one shared client."""
+    queries = parameters["queries"]
+    limit = parameters.get("limit", 10)
+    
+    if not isinstance(queries, list) or not all(isinstance(query, str) for query in queries):
+        raise ValueError("queries must be a list of strings")
+    
+    # Repeated queries in the batch are searched once
+    unique_queries = list(dict.fromkeys(queries))
+    if not unique_queries:
+        return {"results": [], "total": 0}
+    
+    def run(query: str) -> Dict[str, Any]:
+        try:
+            return search({"query": query, "limit": limit})
+        except Exception as e:
+            return {"error": str(e), "query": query}
+    
+    max_workers = min(SEARCH_BATCH_MAX_WORKERS, len(unique_queries))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(unique_queries, executor.map(run, unique_queries)))
     
     return {
-        "results": formatted_results,
+        "results": [results[query] for query in queries],
+        "total": len(queries)
+    }
+
+
+def _rag_result(rag_response, query: str, use_hybrid: bool, use_kg: bool) -> Dict[str, Any]:
+    """Build the rag action result from an R2R RAG response."""
+    generated_answer = rag_response.results.generated_answer if hasattr(rag_response.results, 'generated_answer') else str(rag_response.results)
+    
+    return {
+        "answer": generated_answer,
         "query": query,
-        "limit": limit
+        "use_hybrid": use_hybrid,
+        "use_kg": use_kg
     }
 
 
 def rag(parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Perform a Retrieval-Augmented Generation query."""
-    client = get_r2r_client()
+    query = parameters["query"]
+    use_hybrid = parameters.get("use_hybrid", False)
+    use_kg = parameters.get("use_kg", False)
+    
+    cache_key = _result_cache_key("rag", query, use_hybrid, use_kg)
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    
+    rag_response = _call_r2r(lambda client: client.retrieval.rag(
+        query=query,
+        use_hybrid_search=use_hybrid,
+        use_kg_search=use_kg
+    ))
     
+    result = _rag_result(rag_response, query, use_hybrid, use_kg)
+    _RESULT_CACHE.set(cache_key, dict(result))
+    return result
+
+
+async def arag(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Perform a Retrieval-Augmented Generation query without blocking the event loop."""
     query = parameters["query"]
     use_hybrid = parameters.get("use_hybrid", False)
     use_kg = parameters.get("use_kg", False)
     
-    rag_response = client.retrieval.rag(
+    cache_key = _result_cache_key("rag", query, use_hybrid, use_kg)
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    
+    rag_response = await _acall_r2r(lambda client: client.retrieval.rag(
         query=query,
         use_hybrid_search=use_hybrid,
         use_kg_search=use_kg
+    ))
+    
+    result = _rag_result(rag_response, query, use_hybrid, use_kg)
+    _RESULT_CACHE.set(cache_key, dict(result))
+    return result
+
+
+def _stream_delta(event: Any) -> str:
+    """Extract the generated text carried by one streamed RAG event."""
+    if isinstance(event, str):
+        return event
+    if isinstance(event, bytes):
+        return event.decode("utf-8", "replace")
+    
+    # Message events carry data.delta.content[*].payload.value; other event types carry no text
+    delta = getattr(getattr(event, "data", None), "delta", None)
+    if delta is None:
+        return ""
+    return "".join(
+        getattr(getattr(part, "payload", None), "value", None) or ""
+        for part in getattr(delta, "content", None) or ()
     )
+
+
+def rag_stream(parameters: Dict[str, Any]) -> Iterator[Dict[str, str]]:
+    """Yield a Retrieval-Augmented Generation answer incrementally as {"delta": text} chunks."""
+    query = parameters["query"]
+    use_hybrid = parameters.get("use_hybrid", False)
+    use_kg = parameters.get("use_kg", False)
     
-    generated_answer = rag_response.results.generated_answer if hasattr(rag_response.results, 'generated_answer') else str(rag_response.results)
+    events = _call_r2r(lambda client: client.retrieval.rag(
+        query=query,
+        use_hybrid_search=use_hybrid,
+        use_kg_search=use_kg,
+        rag_generation_config={"stream": True}
+    ))
+    
+    for event in events:
+        delta = _stream_delta(event)
+        if delta:
+            yield {"delta": delta}
+
+
+def stream_rag(parameters: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Run a RAG query, emitting each generated chunk as soon as R2R sends it."""
+    parts = []
+    for chunk in rag_stream(parameters):
+        emit(chunk)
+        parts.append(chunk["delta"])
     
     return {
-        "answer": generated_answer,
-        "query": query,
-        "use_hybrid": use_hybrid,
-        "use_kg": use_kg
+        "answer": "".join(parts),
+        "query": parameters["query"],
+        "use_hybrid": parameters.get("use_hybrid", False),
+        "use_kg": parameters.get("use_kg", False)
     }
 
 
-def list_documents(parameters: Dict[str, Any]) -> Dict[str, Any]:
-    """List documents in the R2R system."""
-    client = get_r2r_client()
-    
-    limit = parameters.get("limit", 10)
-    offset = parameters.get("offset", 0)
-    
-    response = client.documents.list(
+def _fetch_document_page(limit: int, offset: int):
+    """Fetch one page of documents from R2R."""
+    response = _call_r2r(lambda client: client.documents.list(
         limit=limit,
         offset=offset
-    )
-    
-    docs = response.documents if hasattr(response, "documents") else response
+    ))
+    return response.documents if hasattr(response, "documents") else response
+
+
+async def _afetch_document_page(limit: int, offset: int):
+    """Fetch one page of documents from R2R with the async client."""
+    response = await _acall_r2r(lambda client: client.documents.list(
+        limit=limit,
+        offset=offset
+    ))
+    return response.documents if hasattr(response, "documents") else response
+
+
+def _documents_result(docs, limit: int, offset: int) -> Dict[str, Any]:
+    """Build the list_documents action result from one page of documents."""
+    # A single pass over the page; R2R may hand back a one-shot iterable
+    doc_list = list(_iter_items(docs or (), _DOCUMENT_FIELDS))
     
-    if not docs:
+    if not doc_list:
         return {
             "documents": [],
             "message": "Hiç döküman bulunamadı.",
             "total": 0
         }
     
-    doc_list = []
-    for doc in docs:
-        doc_info = {
-            "id": doc.id,
-            "short_id": id_to_shorthand(doc.id)
-        }
-        if hasattr(doc, 'title'):
-            doc_info["title"] = doc.title
-        if hasattr(doc, 'created_at'):
-            doc_info["created_at"] = doc.created_at
-        doc_list.append(doc_info)
-    
     return {
         "documents": doc_list,
-        "total": len(docs),
+        "total": len(doc_list),
+        "limit": limit,
+        "offset": offset
+    }
+
+
+def list_documents(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """List documents in the R2R system."""
+    limit = parameters.get("limit", 10)
+    offset = parameters.get("offset", 0)
+    
+    return _documents_result(_fetch_document_page(limit, offset), limit, offset)
+
+
+async def alist_documents(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """List documents in the R2R system without blocking the event loop."""
+    limit = parameters.get("limit", 10)
+    offset = parameters.get("offset", 0)
+    
+    return _documents_result(await _afetch_document_page(limit, offset), limit, offset)
+
+
+def stream_documents(parameters: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """List documents, emitting each one as {"item": ...} as soon as it is normalized."""
+    limit = parameters.get("limit", 10)
+    offset = parameters.get("offset", 0)
+    
+    total = 0
+    for doc_info in _iter_items(_fetch_document_page(limit, offset), _DOCUMENT_FIELDS):
+        emit({"item": doc_info})
+        total += 1
+    
+    return {
+        "total": total,
         "limit": limit,
         "offset": offset
     }
@@ -217,27 +903,13 @@ def list_documents(parameters: Dict[str, Any]) -> Dict[str, Any]:
 
 def get_document(parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Get detailed information about a specific document."""
-    client = get_r2r_client()
-    
     document_id = parameters["document_id"]
     
     try:
-        response = client.documents.retrieve(id=document_id)
+        response = _call_r2r(lambda client: client.documents.retrieve(id=document_id))
         doc = response.document if hasattr(response, "document") else response
         
-        doc_info = {
-            "id": doc.id,
-            "short_id": id_to_shorthand(doc.id)
-        }
-        
-        if hasattr(doc, 'title'):
-            doc_info["title"] = doc.title
-        if hasattr(doc, 'created_at'):
-            doc_info["created_at"] = doc.created_at
-        if hasattr(doc, 'size'):
-            doc_info["size"] = doc.size
-        if hasattr(doc, 'metadata'):
-            doc_info["metadata"] = doc.metadata
+        doc_info = _EXTRACTORS[_item_kind(doc)](doc, _DOCUMENT_DETAIL_FIELDS)
         
         return {"document": doc_info}
         
@@ -248,29 +920,46 @@ def get_document(parameters: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
+def get_documents_bulk(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Get detailed information about several documents concurrently."""
+    document_ids = parameters["document_ids"]
+    concurrency = parameters.get("concurrency", BULK_FETCH_CONCURRENCY)
+    
+    if not isinstance(document_ids, list) or not all(isinstance(document_id, str) for document_id in document_ids):
+        raise ValueError("document_ids must be a list of strings")
+    if isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 1:
+        raise ValueError("concurrency must be an integer >= 1")
+    
+    results = []
+    if document_ids:
+        # A dedicated pool so `concurrency` is the real number of requests in flight
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(document_ids))) as executor:
+            results = list(executor.map(
+                lambda document_id: get_document({"document_id": document_id}),
+                document_ids
+            ))
+    
+    documents = [r["document"] for r in results if "document" in r]
+    errors = [r for r in results if "error" in r]
+    
+    return {
+        "documents": documents,
+        "errors": errors,
+        "total": len(documents)
+    }
+
+
 def list_collections(parameters: Dict[str, Any]) -> Dict[str, Any]:
     """List collections in the R2R system."""
-    client = get_r2r_client()
-    
     try:
-        response = client.collections.list()
+        response = _call_r2r(lambda client: client.collections.list())
         collections = response.collections if hasattr(response, "collections") else response
         
-        collection_list = []
-        for col in collections:
-            col_info = {
-                "id": col.id,
-                "short_id": id_to_shorthand(col.id)
-            }
-            if hasattr(col, 'name'):
-                col_info["name"] = col.name
-            if hasattr(col, 'description'):
-                col_info["description"] = col.description
-            collection_list.append(col_info)
+        collection_list = list(_iter_items(collections, _COLLECTION_FIELDS))
         
         return {
             "collections": collection_list,
-            "total": len(collections)
+            "total": len(collection_list)
         }
         
     except Exception:
@@ -281,31 +970,306 @@ def list_collections(parameters: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
+_ACTIONS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "search": search,
+    "search_batch": search_batch,
+    "rag": rag,
+    "list_documents": list_documents,
+    "get_document": get_document,
+    "get_documents_bulk": get_documents_bulk,
+    "list_collections": list_collections
+}
+
+
+# Worker-mode handlers for requests sent with "stream": true
+_STREAM_ACTIONS: Dict[str, Callable[[Dict[str, Any], Callable[[Dict[str, Any]], None]], Dict[str, Any]]] = {
+    "rag": stream_rag,
+    "list_documents": stream_documents
+}
+
+
+# Native async handlers, used instead of _ACTIONS on an event loop when the async client is installed
+_ASYNC_ACTIONS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+    "search": asearch,
+    "rag": arag,
+    "list_documents": alist_documents
+}
+
+
+def run_action(action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute a single R2R action."""
+    handler = _ACTIONS.get(action)
+    if handler is None:
+        raise ValueError(f"Unknown action: {action}")
+    return handler(parameters)
+
+
+async def run_action_async(action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute a single R2R action without blocking the running event loop."""
+    handler = _ASYNC_ACTIONS.get(action) if _R2R_ASYNC_AVAILABLE else None
+    if handler is not None:
+        return await handler(parameters)
+    return await asyncio.get_running_loop().run_in_executor(None, run_action, action, parameters)
+
+
+_WRITE_LOCK = threading.Lock()
+
+
+def _with_id(request_id: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Tag a response line with the caller's request id, if one was sent."""
+    if request_id is None:
+        return payload
+    return {"id": request_id, **payload}
+
+
+def _write_line(payload: Dict[str, Any]):
+    """Write one NDJSON response line to stdout."""
+    try:
+        line = _dumpb(payload)
+    except (TypeError, ValueError) as e:
+        # An unserializable result must not take the whole worker down
+        line = _dumpb({"id": payload.get("id"), "error": str(e), "type": type(e).__name__})
+    # Streamed rows are written from executor threads as well as the event loop
+    with _WRITE_LOCK:
+        sys.stdout.buffer.write(line + b"\n")
+        sys.stdout.buffer.flush()
+
+
+# Parameters that make two worker requests of these actions identical
+_COALESCE_KEYS: Dict[str, Callable[[Dict[str, Any]], Tuple[Any, ...]]] = {
+    "search": lambda parameters: (parameters.get("query"), parameters.get("limit", 10)),
+    "rag": lambda parameters: (
+        parameters.get("query"),
+        parameters.get("use_hybrid", False),
+        parameters.get("use_kg", False)
+    )
+}
+
+
+class SearchProcessor:
+    """Dispatch waiting search/rag requests together, sharing one R2R call per identical request."""
+    
+    def __init__(self, batch_size: int = SEARCH_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._dispatches = set()
+        self._task = None
+    
+    def start(self):
+        """Start the background dispatch task."""
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop dispatching once all submitted requests have been answered."""
+        if self._task:
+            self._task.cancel()
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches)
+    
+    async def submit(self, action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a search or rag request and wait for its result."""
+        # Computed here so a malformed request fails on its own, not in the dispatch loop
+        key = (action, _COALESCE_KEYS[action](parameters))
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((key, action, parameters, future))
+        return await future
+    
+    async def _next_batch(self):
+        """Collect the requests already waiting, up to batch_size, without delaying the first one."""
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+    
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            
+            # Identical requests waiting together share one R2R call
+            groups: Dict[Any, list] = {}
+            for key, action, parameters, future in batch:
+                try:
+                    hash(key)
+                except TypeError:
+                    # Unhashable parameters are dispatched on their own
+                    key = id(future)
+                except Exception as e:
+                    # One bad request fails its own future without stopping the loop
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                groups.setdefault(key, []).append((action, parameters, future))
+            
+            # Keep collecting the next batch while this one is in flight
+            task = asyncio.create_task(self._dispatch(list(groups.values())))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+    
+    async def _dispatch(self, groups: list):
+        results = await asyncio.gather(
+            *[run_action_async(waiters[0][0], waiters[0][1]) for waiters in groups],
+            return_exceptions=True
+        )
+        
+        for waiters, result in zip(groups, results):
+            for _, _, future in waiters:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def _read_file_line() -> Optional[bytes]:
+    """Read one line from a regular-file stdin; None if it exceeds MAX_REQUEST_LINE_BYTES."""
+    line = sys.stdin.buffer.readline(MAX_REQUEST_LINE_BYTES + 1)
+    if len(line) <= MAX_REQUEST_LINE_BYTES or line.endswith(b"\n"):
+        return line
+    
+    # Drop the rest of the oversized line
+    while True:
+        rest = sys.stdin.buffer.readline(MAX_REQUEST_LINE_BYTES)
+        if not rest or rest.endswith(b"\n"):
+            return None
+
+
+async def _read_pipe_line(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """Read one line from a pipe stdin; None if it exceeds MAX_REQUEST_LINE_BYTES."""
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        # Last line without a trailing newline, or b"" at EOF
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        await reader.readexactly(e.consumed)
+    
+    # Drop the rest of the oversized line
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+
+
+async def _iter_stdin_lines() -> AsyncIterator[Optional[bytes]]:
+    """Yield request lines from stdin without blocking the event loop.
+    
+    Lines longer than MAX_REQUEST_LINE_BYTES are skipped and yielded as None.
+    """
+    loop = asyncio.get_running_loop()
+    
+    # Regular files cannot be watched by the event loop, read them from a thread instead
+    if stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode):
+        while True:
+            line = await loop.run_in_executor(None, _read_file_line)
+            if line == b"":
+                return
+            yield line
+    
+    reader = asyncio.StreamReader(limit=MAX_REQUEST_LINE_BYTES)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    while True:
+        line = await _read_pipe_line(reader)
+        if line == b"":
+            return
+        yield line
+
+
+async def _handle_request(line: bytes, processor: SearchProcessor):
+    """Run one NDJSON request and write its response line."""
+    request_id = None
+    try:
+        input_data = _loads(line)
+        request_id = input_data.get("id")
+        
+        action = input_data.get("action")
+        parameters = input_data.get("parameters", {})
+        if not isinstance(parameters, dict):
+            raise ValueError("parameters must be an object")
+        
+        loop = asyncio.get_running_loop()
+        
+        if action in _STREAM_ACTIONS and parameters.get("stream"):
+            # One line per streamed chunk, then the usual result as a summary line
+            def emit(payload: Dict[str, Any]):
+                _write_line(_with_id(request_id, {"action": action, **payload}))
+            
+            result = await loop.run_in_executor(None, _STREAM_ACTIONS[action], parameters, emit)
+        elif action in _COALESCE_KEYS:
+            result = await processor.submit(action, parameters)
+        else:
+            result = await run_action_async(action, parameters)
+        
+    except Exception as e:
+        result = {
+            "error": str(e),
+            "type": type(e).__name__
+        }
+    
+    # Requests run concurrently, so echo the caller's id to match responses
+    _write_line(_with_id(request_id, result))
+
+
+async def serve():
+    """Serve newline-delimited JSON requests from stdin until EOF."""
+    pending = set()
+    processor = SearchProcessor()
+    processor.start()
+    
+    async for line in _iter_stdin_lines():
+        if line is None:
+            # The request could not be read, so it has no id to echo
+            _write_line({
+                "error": f"Request line exceeds {MAX_REQUEST_LINE_BYTES} bytes",
+                "type": "ValueError"
+            })
+            continue
+        if not line.strip():
+            continue
+        task = asyncio.create_task(_handle_request(line, processor))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    
+    if pending:
+        await asyncio.gather(*pending)
+    await processor.stop()
+    await close_r2r_async_clients()
+
+
+def _write_result(result: Dict[str, Any]):
+    """Write the single-shot JSON result to stdout as bytes in one write."""
+    sys.stdout.buffer.write(_dumpb(result) + b"\n")
+    sys.stdout.buffer.flush()
+
+
 def main():
     """Main execution function"""
+    # Persistent worker: reuse the process, imports and logged-in client across many requests
+    if os.getenv("R2R_WORKER") == "1":
+        try:
+            import uvloop
+        except ImportError:
+            asyncio.run(serve())
+        else:
+            uvloop.run(serve())
+        return
+    
     try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
+        # Read input from stdin; both parsers accept raw bytes, so skip the text decode
+        input_data = _loads(sys.stdin.buffer.read())
         
         action = input_data.get("action")
         parameters = input_data.get("parameters", {})
         
         # Execute action
-        if action == "search":
-            result = search(parameters)
-        elif action == "rag":
-            result = rag(parameters)
-        elif action == "list_documents":
-            result = list_documents(parameters)
-        elif action == "get_document":
-            result = get_document(parameters)
-        elif action == "list_collections":
-            result = list_collections(parameters)
-        else:
-            raise ValueError(f"Unknown action: {action}")
+        result = run_action(action, parameters)
         
         # Return result
-        print(json.dumps(result))
+        _write_result(result)
         
     except Exception as e:
         # Return error
@@ -313,9 +1277,9 @@ def main():
             "error": str(e),
             "type": type(e).__name__
         }
-        print(json.dumps(error_result))
+        _write_result(error_result)
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()